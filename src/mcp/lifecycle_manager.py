@@ -11,9 +11,15 @@ class LifecycleManager(Generic[T]):
             id_getter: Callable[[T], str]
     ):
         self._items: Dict[str, T] = {}
+        # bumped on every mutation, whether or not listeners are notified
+        self._version = 0
         self.on_change = on_change
         self._get_id = id_getter
 
+    @property
+    def version(self) -> int:
+        return self._version
+
     def list(self) -> List[T]:
         return list(self._items.values())
 
@@ -24,17 +30,17 @@ class LifecycleManager(Generic[T]):
         if not items:
             return
 
-        ids_to_add = set()
+        staged = {}
         for item in items:
             item_id = self._get_id(item)
             if item_id in self._items:
                 raise ValueError(f"Transaction failed: Item '{item_id}' already exists.")
-            if item_id in ids_to_add:
+            if item_id in staged:
                 raise ValueError(f"Transaction failed: Duplicate item '{item_id}' in input list.")
-            ids_to_add.add(item_id)
+            staged[item_id] = item
 
-        for item in items:
-            self._items[self._get_id(item)] = item
+        self._items.update(staged)
+        self._version += 1
 
         if notify:
             self.on_change()
@@ -43,17 +49,17 @@ class LifecycleManager(Generic[T]):
         if not items:
             return
 
-        ids_to_update = set()
+        staged = {}
         for item in items:
             item_id = self._get_id(item)
             if item_id not in self._items:
                 raise ValueError(f"Transaction failed: Cannot update '{item_id}' (not found).")
-            if item_id in ids_to_update:
+            if item_id in staged:
                 raise ValueError(f"Transaction failed: Duplicate item '{item_id}' in input list.")
-            ids_to_update.add(item_id)
+            staged[item_id] = item
 
-        for item in items:
-            self._items[self._get_id(item)] = item
+        self._items.update(staged)
+        self._version += 1
 
         if notify:
             self.on_change()
@@ -64,6 +70,7 @@ class LifecycleManager(Generic[T]):
 
         for item in items:
             self._items[self._get_id(item)] = item
+        self._version += 1
 
         if notify:
             self.on_change()
@@ -78,6 +85,9 @@ class LifecycleManager(Generic[T]):
                 del self._items[identifier]
                 modified = True
 
+        if modified:
+            self._version += 1
+
         if notify and modified:
             self.on_change()
 
@@ -90,6 +100,7 @@ class LifecycleManager(Generic[T]):
             new_registry[item_id] = item
 
         self._items = new_registry
+        self._version += 1
 
         if notify:
             self.on_change()
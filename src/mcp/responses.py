@@ -0,0 +1,13 @@
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered by pydantic-core's Rust serializer instead of stdlib json.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -1,15 +1,21 @@
 import asyncio
-import json
-import uuid
+import contextlib
+import secrets
 import time
+import zlib
 
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Any, AsyncIterator
 
 from fastapi import APIRouter, Request, Response
 from fastapi.responses import StreamingResponse
-from starlette.responses import JSONResponse
+from pydantic import ValidationError
+from pydantic_core import to_json
 
-from mcp.schemas.other import JsonRpcError, PARSE_ERROR, INVALID_REQUEST, JsonRpcRequest, INTERNAL_ERROR
+from mcp.responses import PydanticJSONResponse
+from mcp.schemas.other import (
+    JsonRpcError, PARSE_ERROR, INVALID_REQUEST, JsonRpcRequest, INTERNAL_ERROR, JsonRpcNotification
+)
 from mcp.server import MCPServer
 from mcp.session import Session
 
@@ -18,81 +24,94 @@ class MCPRouter(APIRouter):
     HEADER_SESSION_ID_KEY: str = "Mcp-Session-Id"
     CLEANUP_INTERVAL: int = 300
     SESSION_TIMEOUT: int = 86400
+    COMPRESS_SSE: bool = True
 
     def __init__(self, server: MCPServer, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.server = server
-        self.sessions: Dict[str, Session] = {}
+        # ordered from least to most recently touched, so expiry only scans stale sessions
+        self.sessions: OrderedDict[str, Session] = OrderedDict()
 
         self.server.subscribe(self._broadcast_event)
-        self._cleanup_task = asyncio.create_task(self._monitor_sessions())
+        # started with the first session, so the router can be built outside a running loop
+        self._cleanup_task: asyncio.Task | None = None
 
-        self.add_api_route("/mcp", self.handle_mcp, methods=["POST", "GET", "DELETE"])
+        self.add_api_route("/mcp", self._handle_get, methods=["GET"])
+        self.add_api_route("/mcp", self._handle_post, methods=["POST"])
+        self.add_api_route("/mcp", self._handle_delete, methods=["DELETE"])
 
-    async def _broadcast_event(self, notification: Any):
-        if not self.sessions:
-            return
+    def _add_session(self, session_id: str) -> Session:
+        session = Session(session_id)
+        self.sessions[session_id] = session
+
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._monitor_sessions())
 
-        for session in self.sessions.values():
-            if session.active:
-                session.enqueue_message(notification)
+        return session
 
-    async def handle_mcp(self, request: Request):
-        if request.method == "GET":
-            return await self._handle_get(request)
+    async def _broadcast_event(self, notification: JsonRpcNotification):
+        if not self.sessions:
+            return
 
-        elif request.method == "POST":
-            return await self._handle_post(request)
+        # serialized once and shared by every session's stream
+        payload = to_json(notification)
 
-        elif request.method == "DELETE":
-            return await self._handle_delete(request)
+        active_sessions = tuple(session for session in self.sessions.values() if session.active)
 
-        return Response(status_code=405)
+        for session in active_sessions:
+            session.enqueue_message(payload)
 
     async def _handle_get(self, request: Request) -> Response:
-        session_id = request.headers.get(self.HEADER_SESSION_ID_KEY) or str(uuid.uuid4())
+        session_id = request.headers.get(self.HEADER_SESSION_ID_KEY) or secrets.token_hex(16)
 
         if session_id not in self.sessions:
-            self.sessions[session_id] = Session(session_id)
+            self._add_session(session_id)
 
         session = self.sessions[session_id]
-        session.touch()
+        self._touch_session(session)
 
-        return StreamingResponse(
-            self.sse_generator(session),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                self.HEADER_SESSION_ID_KEY: session.id
-            }
-        )
+        stream = self.sse_generator(session)
+        headers = {
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            self.HEADER_SESSION_ID_KEY: session.id
+        }
+
+        # GZipMiddleware skips text/event-stream, so the stream is compressed here
+        if self.COMPRESS_SSE and self._accepts_gzip(request.headers.get("accept-encoding", "")):
+            stream = self._gzip_stream(stream)
+            headers["Content-Encoding"] = "gzip"
+            headers["Vary"] = "Accept-Encoding"
+
+        return StreamingResponse(stream, media_type="text/event-stream", headers=headers)
 
     async def _handle_post(self, request: Request) -> Response:
         content_type = request.headers.get("content-type", "")
         if "application/json" not in content_type:
             return Response(status_code=415, content="content-type must be application/json")
 
-        try:
-            body = await request.json()
-        except Exception as e:
-            return JSONResponse(
-                status_code=400,
-                content=JsonRpcError(
-                    code=PARSE_ERROR, message=f"cannot parse request body: {str(e)}"
-                ).model_dump()
-            )
+        body = await request.body()
 
-        if isinstance(body, list):
+        if body.lstrip()[:1] == b"[":
             # todo: support batching
-            return JSONResponse(
+            return PydanticJSONResponse(
                 status_code=400,
                 content=JsonRpcError(
                     code=INVALID_REQUEST, message="batching is not supported"
                 ).model_dump()
             )
 
-        rpc_req = JsonRpcRequest(**body)
+        try:
+            rpc_req = JsonRpcRequest.model_validate_json(body)
+        except ValidationError as e:
+            error = e.errors()[0]
+            if error["type"] == "json_invalid":
+                rpc_error = JsonRpcError(code=PARSE_ERROR, message=f"cannot parse request body: {error['msg']}")
+            else:
+                rpc_error = JsonRpcError(code=INVALID_REQUEST, message=f"invalid request: {error['msg']}")
+
+            return PydanticJSONResponse(status_code=400, content=rpc_error.model_dump())
+
         session_id = request.headers.get(self.HEADER_SESSION_ID_KEY)
 
         if rpc_req.method == "initialize":
@@ -105,16 +124,27 @@ class MCPRouter(APIRouter):
         if not session:
             return Response(status_code=404, content=f"session {session_id} is not found")
 
-        session.touch()
+        self._touch_session(session)
         asyncio.create_task(self._process_background(session, rpc_req))
 
         return Response(status_code=202)
 
     async def _process_background(self, session: Session, rpc_req: JsonRpcRequest):
         try:
-            async for result in self.server.process_request(rpc_req):
+            prebuilt = self.server.get_prebuilt_response_bytes(rpc_req)
+            if prebuilt is not None:
+                session.enqueue_message(prebuilt)
+                return
+
+            if not self.server.is_streaming(rpc_req):
+                result = await self.server.process_request_single(rpc_req)
+                if result:
+                    session.enqueue_message(to_json(result, exclude_none=True))
+                return
+
+            async for result in self.server.process_request_stream(rpc_req):
                 if result:
-                    session.enqueue_message(result.model_dump(exclude_none=True))
+                    session.enqueue_message(to_json(result, exclude_none=True))
 
         except Exception as e:
             err_resp = JsonRpcError(
@@ -122,25 +152,22 @@ class MCPRouter(APIRouter):
                 code=INTERNAL_ERROR,
                 message=f"Internal processing error: {str(e)}"
             )
-            session.enqueue_message(err_resp.model_dump())
+            session.enqueue_message(to_json(err_resp))
 
     async def _create_session(self, rpc_req: JsonRpcRequest, existing_session_id: str | None = None) -> Response:
-        new_sess_id = existing_session_id or str(uuid.uuid4())
+        new_sess_id = existing_session_id or secrets.token_hex(16)
 
         if new_sess_id not in self.sessions:
-            session = Session(new_sess_id)
-            self.sessions[new_sess_id] = session
+            self._add_session(new_sess_id)
 
-        rpc_resp = None
-        async for res in self.server.process_request(rpc_req):
-            rpc_resp = res
-            break
+        rpc_resp = await self.server.process_request_single(rpc_req)
 
         if not rpc_resp:
             return Response(status_code=500, content="Initialization failed to produce response")
 
-        return JSONResponse(
-            content=rpc_resp.model_dump(exclude_none=True),
+        return Response(
+            content=rpc_resp.model_dump_json(exclude_none=True),
+            media_type="application/json",
             headers={self.HEADER_SESSION_ID_KEY: new_sess_id}
         )
 
@@ -157,24 +184,45 @@ class MCPRouter(APIRouter):
         return Response(status_code=404)
 
     @staticmethod
-    async def sse_generator(session: Session):
+    def _format_event(event_id: int, msg: Any) -> bytes:
+        payload = msg if isinstance(msg, bytes) else to_json(msg)
+
+        return b"id: %d\nevent: message\ndata: %s\n\n" % (event_id, payload)
+
+    def _touch_session(self, session: Session):
+        session.touch()
+        if session.id in self.sessions:
+            self.sessions.move_to_end(session.id)
+
+    async def sse_generator(self, session: Session):
+        # bound once, the loop below runs for the lifetime of the stream
+        wait_for = asyncio.wait_for
+        monotonic_ns = time.monotonic_ns
+        wait_for_messages = session.wait_for_messages
+        drain_messages = session.drain_messages
+        format_event = self._format_event
+        touch_session = self._touch_session
+
         try:
-            yield ": connected\n\n"
+            yield b": connected\n\n"
 
             while session.active:
                 try:
-                    msg = await asyncio.wait_for(session.msg_queue.get(), timeout=60.0)
+                    await wait_for(wait_for_messages(), timeout=60.0)
 
-                    event_id = str(int(time.time() * 1000))
-                    payload = json.dumps(msg)
+                    # one clock read per batch, events within it numbered consecutively
+                    event_id = max(monotonic_ns() // 1_000_000, session.last_event_id + 1)
+                    events = [format_event(event_id + i, msg) for i, msg in enumerate(drain_messages())]
 
-                    yield f"id: {event_id}\nevent: message\ndata: {payload}\n\n"
+                    if events:
+                        session.last_event_id = event_id + len(events) - 1
+                        yield b"".join(events)
 
-                    session.touch()
+                    touch_session(session)
 
                 except asyncio.TimeoutError:
-                    yield ": ping\n\n"
-                    session.touch()
+                    yield b": ping\n\n"
+                    touch_session(session)
 
         except asyncio.CancelledError:
             pass
@@ -182,21 +230,63 @@ class MCPRouter(APIRouter):
         except Exception as e:
             pass
 
-    def __del__(self):
-        if hasattr(self, '_cleanup_task'):
-            self._cleanup_task.cancel()
+    @staticmethod
+    def _accepts_gzip(accept_encoding: str) -> bool:
+        for coding in accept_encoding.split(","):
+            name, _, params = coding.partition(";")
+            if name.strip().lower() not in ("gzip", "x-gzip"):
+                continue
+
+            # a q-value of 0 is an explicit refusal; unparsable ones are treated the same way
+            quality = 1.0
+            for param in params.split(";"):
+                key, _, value = param.partition("=")
+                if key.strip().lower() == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+
+            return quality > 0
+
+        return False
+
+    @staticmethod
+    async def _gzip_stream(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+
+        async for chunk in stream:
+            # sync flush after every chunk so events are delivered immediately
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        yield compressor.flush()
+
+    async def aclose(self):
+        if self._cleanup_task is None:
+            return
+
+        self._cleanup_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._cleanup_task
+
+        self._cleanup_task = None
 
     async def _monitor_sessions(self):
+        sleep = asyncio.sleep
+        sessions = self.sessions
+
         while True:
             try:
-                await asyncio.sleep(self.CLEANUP_INTERVAL)
-                cutoff = time.time() - self.SESSION_TIMEOUT
-
-                for session_id in list(self.sessions.keys()):
-                    session = self.sessions[session_id]
-                    if session.last_accessed < cutoff:
-                        session.terminate()
-                        self.sessions.pop(session_id, None)
+                await sleep(self.CLEANUP_INTERVAL)
+                cutoff = time.monotonic() - self.SESSION_TIMEOUT
+
+                while sessions:
+                    session_id, session = next(iter(sessions.items()))
+                    if session.last_accessed >= cutoff:
+                        break
+
+                    session.terminate()
+                    sessions.pop(session_id)
 
             except asyncio.CancelledError:
                 break
@@ -5,17 +5,19 @@ from typing import List, Literal
 from pydantic import BaseModel, field_validator, Field
 
 
+_SIZE_PATTERN = re.compile(r'any|[1-9]\d*x[1-9]\d*')
+
+
 class Icon(BaseModel):
     src: str
     mimeType: str
     sizes: List[str] = Field(default_factory=list)
 
-    @classmethod
     @field_validator('sizes')
+    @classmethod
     def validate_sizes(cls, v: List[str]) -> List[str]:
-        pattern = re.compile(r'any|([1-9]\d*)x([1-9]\d*)')
         for size in v:
-            if not pattern.fullmatch(size):
+            if not _SIZE_PATTERN.fullmatch(size):
                 raise ValueError(
                     f"Invalid size '{size}'. Must be 'any' or 'WIDTHxHEIGHT'."
                 )
@@ -1,9 +1,9 @@
-from typing import Literal, Dict, Any
+from typing import Literal, Dict, Any, get_args
 
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel
 
 
-LOGGING_LEVELS = [
+LoggingLevel = Literal[
     "debug",
     "info",
     "notice",
@@ -14,18 +14,14 @@ LOGGING_LEVELS = [
     "emergency",
 ]
 
+LOGGING_LEVELS = list(get_args(LoggingLevel))
+
 
 class LoggingParams(BaseModel):
-    level: str
+    level: LoggingLevel
     logger: str
     data: Dict[str, Any]
 
-    @model_validator(mode="after")
-    def validate_level(self, level):
-        if level not in LOGGING_LEVELS:
-            raise ValueError(f"Invalid logging level: {level}; must be one of {LOGGING_LEVELS}")
-        return level
-
 
 class LoggingResponse(BaseModel):
     jsonrpc: Literal["2.0"] = "2.0"
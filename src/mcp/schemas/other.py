@@ -1,5 +1,6 @@
-from typing import Any, Dict, Literal, Union
-from pydantic import BaseModel, model_serializer
+from typing import Annotated, Any, Dict, Literal, Union, TypedDict
+from pydantic import BaseModel, ConfigDict, PlainValidator, model_serializer
+from pydantic_core import PydanticCustomError
 
 
 INVALID_REQUEST = -32600
@@ -18,6 +19,29 @@ class JsonRpcRequest(BaseModel):
     id: Union[str, int] | None = None
 
 
+def _validate_progress_token(value: Any) -> Union[str, int]:
+    # strict: booleans and floats are not coerced, and the error names no union members
+    if isinstance(value, (str, int)) and not isinstance(value, bool):
+        return value
+    raise PydanticCustomError("progress_token_type", "must be a string or integer")
+
+
+ProgressToken = Annotated[Union[str, int], PlainValidator(_validate_progress_token)]
+
+
+class RequestMeta(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    progressToken: ProgressToken | None = None
+
+
+class JsonRpcNotification(TypedDict, total=False):
+    """Server-built outbound notification, serialized as-is without re-validation."""
+    jsonrpc: Literal["2.0"]
+    method: str
+    params: Dict[str, Any]
+
+
 class JsonRpcResponse(BaseModel):
     jsonrpc: Literal["2.0"] = "2.0"
     id: Union[str, int] | None = None
@@ -62,6 +62,11 @@ class PromptsGetResult(BaseModel):
     messages: List[PromptMessage]
 
 
+class PromptsGetParams(BaseModel):
+    name: str = Field(min_length=1)
+    arguments: Dict[str, Any] = Field(default_factory=dict)
+
+
 class Prompt(BaseModel):
     """Server-side internal representation."""
     func: Callable[[Dict[str, Any]], Awaitable[PromptsGetResult]]
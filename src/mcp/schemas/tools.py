@@ -1,13 +1,21 @@
-import re
+import inspect
+import string
 
-from typing import Dict, Any, Literal, List, Union, Awaitable, Callable, AsyncIterator
+from typing import Annotated, Dict, Any, Literal, List, Tuple, Union, Awaitable, Callable, AsyncIterator
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Discriminator, Field, PrivateAttr, Tag, field_validator
 
 from mcp.schemas.common import Icon, Annotations
+from mcp.schemas.other import ProgressToken, RequestMeta
 from mcp.schemas.resources import ResourceDataText, ResourceDataBinary
 
 
+FuncKind = Literal["asyncgen", "coroutine", "unknown"]
+
+# deletes every allowed character, so a valid name translates to ''
+_TOOL_NAME_STRIP = str.maketrans('', '', string.ascii_letters + string.digits + '_.-')
+
+
 class ToolResultText(BaseModel):
     type: Literal["text"] = "text"
     text: str
@@ -43,12 +51,45 @@ class ToolResultResourceLink(BaseModel):
     annotations: Annotations | None = None
 
 
-ToolContent = Union[
-    ToolResultText,
-    ToolResultImage,
-    ToolResultAudio,
-    ToolResultResource,
-    ToolResultResourceLink
+def _classify_func(func: Callable) -> FuncKind:
+    if inspect.isasyncgenfunction(func):
+        return "asyncgen"
+    if inspect.iscoroutinefunction(func):
+        return "coroutine"
+    return "unknown"
+
+
+def _tool_content_tag(value: Any) -> str | None:
+    if not isinstance(value, dict):
+        return getattr(value, "type", None)
+
+    tag = value.get("type")
+    if tag is not None:
+        return tag
+
+    # `type` has a default on every variant, so untagged dicts are routed by their required fields,
+    # in the same order the plain union used to try them
+    if "text" in value:
+        return "text"
+    if "data" in value:
+        return "image"
+    if "resource" in value:
+        return "resource"
+    if "uri" in value:
+        return "resource_link"
+    return None
+
+
+# tagged by `type`, so validation picks the variant directly instead of trying each in turn
+ToolContent = Annotated[
+    Union[
+        Annotated[ToolResultText, Tag("text")],
+        Annotated[ToolResultImage, Tag("image")],
+        Annotated[ToolResultAudio, Tag("audio")],
+        Annotated[ToolResultResource, Tag("resource")],
+        Annotated[ToolResultResourceLink, Tag("resource_link")]
+    ],
+    Discriminator(_tool_content_tag)
 ]
 
 
@@ -60,17 +101,26 @@ class ToolDefinition(BaseModel):
     outputSchema: Dict[str, Any] | None = None
     icons: List[Icon] | None = None
 
-    @classmethod
     @field_validator('name')
+    @classmethod
     def validate_name(cls, v: str) -> str:
-        if not re.match(r'^[a-zA-Z0-9_.-]+$', v):
+        # empty names are already rejected by min_length
+        if v.translate(_TOOL_NAME_STRIP):
             raise ValueError(f"Invalid tool name '{v}'")
         return v
 
 
 class CallToolParams(BaseModel):
-    name: str
-    arguments: Dict[str, Any]
+    name: str = Field(min_length=1)
+    arguments: Dict[str, Any] = Field(default_factory=dict)
+    progressToken: ProgressToken | None = None
+    meta: RequestMeta | None = Field(default=None, alias="_meta")
+
+    @property
+    def progress_token(self) -> str | int | None:
+        if self.progressToken is not None:
+            return self.progressToken
+        return self.meta.progressToken if self.meta is not None else None
 
 
 class ToolsCallResult(BaseModel):
@@ -120,3 +170,24 @@ class Tool(BaseModel):
     ]
     definition: ToolDefinition
     timeout: int = 60
+
+    # (func, kind) classified at registration and reused while func is the same object;
+    # keyed on func so model_copy(update=...) or reassigning func reclassifies
+    _func_kind: Tuple[Callable | None, FuncKind] = PrivateAttr(default=(None, "unknown"))
+
+    def model_post_init(self, context: Any) -> None:
+        self._func_kind = (self.func, _classify_func(self.func))
+
+    @property
+    def func_kind(self) -> FuncKind:
+        """
+        "unknown" for plain callables that return an awaitable (e.g. lambdas) and objects with an async
+        __call__, whose return value has to be probed. Partials of async functions are unwrapped and classified.
+        """
+        func = self.func
+        classified_func, kind = self._func_kind
+        if classified_func is not func:
+            kind = _classify_func(func)
+            self._func_kind = (func, kind)
+
+        return kind
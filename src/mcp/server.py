@@ -1,16 +1,20 @@
 import asyncio
-import inspect
-from typing import AsyncIterator, List, Callable, Awaitable, Any
+from typing import AsyncIterator, List, Callable, Awaitable, Literal, Dict, Tuple, Any, TypeVar, cast
 from collections.abc import AsyncIterator as AsyncIteratorAbc
 
+from pydantic import ValidationError
+from pydantic_core import to_json
+
 from mcp.lifecycle_manager import LifecycleManager
 from mcp.schemas.other import (
-    JsonRpcRequest, JsonRpcResponse, JsonRpcError, METHOD_NOT_FOUND, INTERNAL_ERROR,
+    JsonRpcRequest, JsonRpcResponse, JsonRpcError, JsonRpcNotification, METHOD_NOT_FOUND, INTERNAL_ERROR,
     JsonRpcResponseInitializeResult, INVALID_PARAMS,
     RESOURCE_NOT_FOUND
 )
 from mcp.schemas.progress import ProgressNotification, ProgressNotificationParams
-from mcp.schemas.prompts import PromptsResponse, PromptsListResponseResult, PromptsChangedResponse, Prompt
+from mcp.schemas.prompts import (
+    PromptsResponse, PromptsListResponseResult, PromptsChangedResponse, Prompt, PromptsGetParams
+)
 from mcp.schemas.resources import (
     ResourcesResponse, ResourcesListResponseResult,
     ResourcesReadResponseResult, ResourcesTemplatesListResult,
@@ -18,17 +22,41 @@ from mcp.schemas.resources import (
 )
 from mcp.schemas.tools import (
     ToolResultText, ToolsResponse, ToolsCallResult, ToolsListResponseResult,
-    ToolsChangedNotification, ToolProgress, ToolResult, Tool
+    ToolsChangedNotification, ToolProgress, ToolResult, Tool, CallToolParams
 )
 
 
+_TOOLS_CHANGED = cast(JsonRpcNotification, ToolsChangedNotification().model_dump())
+_PROMPTS_CHANGED = cast(JsonRpcNotification, PromptsChangedResponse().model_dump())
+_RESOURCES_CHANGED = cast(JsonRpcNotification, ResourcesChangedNotification().model_dump())
+
+
+HandlerKind = Literal["sync", "async", "stream"]
+
+R = TypeVar("R")
+
+
+async def _notify_safely(handler: Callable[[JsonRpcNotification], Awaitable[None]], event: JsonRpcNotification):
+    # a failing subscriber must not affect the others
+    try:
+        await handler(event)
+    except Exception:
+        pass
+
+
+def _invalid_params(request: JsonRpcRequest, e: ValidationError) -> JsonRpcError:
+    error = e.errors()[0]
+    location = ".".join(str(part) for part in error["loc"])
+    return JsonRpcError(id=request.id, code=INVALID_PARAMS, message=f"Invalid params: {location}: {error['msg']}")
+
+
 class MCPServer:
     VERSION = "1.0.0"
 
     def __init__(self, name: str):
         self.name = name
 
-        self._notification_handlers: List[Callable[[dict], Awaitable[None]]] = []
+        self._notification_handlers: List[Callable[[JsonRpcNotification], Awaitable[None]]] = []
 
         self.tools: LifecycleManager[Tool] = LifecycleManager(
             on_change=self._on_tools_changed,
@@ -47,36 +75,96 @@ class MCPServer:
             id_getter=lambda r: r.name
         )
 
+        # registry -> (registry version, list result built at that version, its serialized JSON)
+        self._list_results: Dict[LifecycleManager, Tuple[int, Any, bytes]] = {}
+
+        self._dispatch: Dict[str, Tuple[HandlerKind, Callable[[JsonRpcRequest], Any]]] = {
+            "initialize": ("sync", self._handle_initialize),
+            "notifications/initialized": ("sync", self._handle_initialized),
+            "ping": ("sync", self._handle_ping),
+            "tools/list": ("sync", self._handle_tools_list),
+            "tools/call": ("stream", self._handle_tool_call),
+            "prompts/list": ("sync", self._handle_prompts_list),
+            "prompts/get": ("async", self._handle_prompts_get),
+            "resources/list": ("sync", self._handle_resources_list),
+            "resources/read": ("sync", self._handle_resources_read),
+            "resources/templates/list": ("sync", self._handle_resources_templates_list),
+        }
+
+        self._list_sources: Dict[str, Tuple[LifecycleManager, Callable[[], Any]]] = {
+            "tools/list": (self.tools, self._build_tools_list),
+            "prompts/list": (self.prompts, self._build_prompts_list),
+            "resources/list": (self.resources, self._build_resources_list),
+            "resources/templates/list": (self.resources_templates, self._build_resources_templates_list),
+        }
+
         # todo: set log level
         # todo: handle pagination?
 
-    def subscribe(self, handler: Callable[[dict], Awaitable[None]]):
+    def subscribe(self, handler: Callable[[JsonRpcNotification], Awaitable[None]]):
+        """
+        Handlers receive outbound notifications as plain JSON-RPC dicts (not models), each call its own
+        shallow copy, so a handler mutating its event cannot leak into the shared prebuilt payloads.
+        """
         self._notification_handlers.append(handler)
 
-    async def notify_clients(self, event: Any):
-        await asyncio.gather(
-            *(
-                handler(event)
-                for handler in self._notification_handlers
-            ),
-            return_exceptions=True
-        )
+    async def notify_clients(self, event: JsonRpcNotification):
+        handlers = self._notification_handlers
+
+        if not handlers:
+            return
+
+        # a single subscriber (one router) is the usual setup and needs no fan-out
+        if len(handlers) == 1:
+            await _notify_safely(handlers[0], event.copy())
+            return
+
+        async with asyncio.TaskGroup() as tg:
+            for handler in handlers:
+                tg.create_task(_notify_safely(handler, event.copy()))
 
     def _on_tools_changed(self):
-        event = ToolsChangedNotification()
-        asyncio.create_task(self.notify_clients(event))
+        asyncio.create_task(self.notify_clients(_TOOLS_CHANGED))
 
     def _on_prompts_changed(self):
-        event = PromptsChangedResponse()
-        asyncio.create_task(self.notify_clients(event))
+        asyncio.create_task(self.notify_clients(_PROMPTS_CHANGED))
 
     def _on_resources_changed(self):
-        event = ResourcesChangedNotification()
-        asyncio.create_task(self.notify_clients(event))
+        asyncio.create_task(self.notify_clients(_RESOURCES_CHANGED))
 
     def _on_resources_templates_changed(self):
         pass
 
+    def _cached_list_result(self, registry: LifecycleManager, build: Callable[[], R]) -> Tuple[R, bytes]:
+        cached = self._list_results.get(registry)
+        if cached is None or cached[0] != registry.version:
+            result = build()
+            cached = (registry.version, result, to_json(result, exclude_none=True))
+            self._list_results[registry] = cached
+
+        return cached[1], cached[2]
+
+    def get_prebuilt_response_bytes(self, request: JsonRpcRequest) -> bytes | None:
+        """
+        Serialized response for ping and list methods, spliced from cached result JSON; None otherwise.
+        """
+        if request.id is None:
+            return None
+
+        if request.method == "ping":
+            return b'{"jsonrpc":"2.0","id":%s,"result":{}}' % to_json(request.id)
+
+        list_source = self._list_sources.get(request.method)
+        if list_source is None:
+            return None
+
+        _, result_json = self._cached_list_result(*list_source)
+        return b'{"jsonrpc":"2.0","id":%s,"result":%s}' % (to_json(request.id), result_json)
+
+    def is_streaming(self, request: JsonRpcRequest) -> bool:
+        handler = self._dispatch.get(request.method)
+        return handler is not None and handler[0] == "stream"
+
     async def process_request(
             self, request: JsonRpcRequest
     ) -> AsyncIterator[
@@ -84,68 +172,93 @@ class MCPServer:
         ProgressNotification | ToolsResponse |
         PromptsResponse | ResourcesResponse
     ]:
-        try:
-            if request.method == "initialize":
-                yield self._handle_initialize(request)
+        if self.is_streaming(request):
+            async for response in self.process_request_stream(request):
+                yield response
+        else:
+            yield await self.process_request_single(request)
 
-            elif request.method == "notifications/initialized":
-                yield None
+    async def process_request_single(
+            self, request: JsonRpcRequest
+    ) -> JsonRpcResponse | JsonRpcError | None | PromptsResponse | ResourcesResponse | ToolsResponse:
+        # no blanket try/except: handlers that run user code catch their own errors,
+        # anything else escaping here is a server bug left to the transport's safety net
+        handler = self._dispatch.get(request.method)
 
-            elif request.method == "ping":
-                yield JsonRpcResponse(id=request.id, result={})
+        if handler is None:
+            return JsonRpcError(
+                id=request.id,
+                code=METHOD_NOT_FOUND,
+                message=f"Method '{request.method}' not supported"
+            )
 
-            elif request.method == "tools/list":
-                yield self._handle_tools_list(request)
+        kind, func = handler
 
-            elif request.method == "tools/call":
-                async for response in self._handle_tool_call(request):
-                    yield response
+        if kind == "sync":
+            return func(request)
 
-            elif request.method == "prompts/list":
-                yield self._handle_prompts_list(request)
+        if kind == "async":
+            return await func(request)
 
-            elif request.method == "prompts/get":
-                yield await self._handle_prompts_get(request)
+        return JsonRpcError(
+            id=request.id,
+            code=INTERNAL_ERROR,
+            message=f"Method '{request.method}' streams its responses"
+        )
 
-            elif request.method == "resources/list":
-                yield self._handle_resources_list(request)
+    async def process_request_stream(
+            self, request: JsonRpcRequest
+    ) -> AsyncIterator[JsonRpcError | ProgressNotification | ToolsResponse]:
+        handler = self._dispatch.get(request.method)
 
-            elif request.method == "resources/read":
-                yield self._handle_resources_read(request)
+        if handler is None:
+            yield JsonRpcError(
+                id=request.id,
+                code=METHOD_NOT_FOUND,
+                message=f"Method '{request.method}' not supported"
+            )
+            return
 
-            elif request.method == "resources/templates/list":
-                yield self._handle_resources_templates_list(request)
+        kind, func = handler
 
-            else:
-                yield JsonRpcError(
-                    id=request.id,
-                    code=METHOD_NOT_FOUND,
-                    message=f"Method '{request.method}' not supported"
-                )
-
-        except Exception as e:
+        if kind != "stream":
             yield JsonRpcError(
                 id=request.id,
                 code=INTERNAL_ERROR,
-                message=f"Internal Server Error: {str(e)}"
+                message=f"Method '{request.method}' does not stream its responses"
             )
+            return
 
+        async for response in func(request):
+            yield response
+
+    # Responses are assembled from registered (already validated) models and server state,
+    # so they skip re-validation via model_construct. Only request.params is untrusted input.
     def _handle_initialize(self, request: JsonRpcRequest) -> JsonRpcResponse:
-        return JsonRpcResponse(
+        return JsonRpcResponse.model_construct(
             id=request.id,
             result=JsonRpcResponseInitializeResult.new(self.name, self.VERSION)
         )
 
+    def _handle_initialized(self, request: JsonRpcRequest) -> None:
+        return None
+
+    def _handle_ping(self, request: JsonRpcRequest) -> JsonRpcResponse:
+        return JsonRpcResponse.model_construct(id=request.id, result={})
+
 
     def _handle_resources_list(self, request: JsonRpcRequest) -> ResourcesResponse | JsonRpcError:
         if request.id is None:
             return JsonRpcError(id=request.id, code=INVALID_PARAMS, message="Request ID is missing")
 
-        return ResourcesResponse(
+        return ResourcesResponse.model_construct(
             id=request.id,
-            result=ResourcesListResponseResult(
-                resources=[r.definition for r in self.resources.list()]
-            )
+            result=self._cached_list_result(self.resources, self._build_resources_list)[0]
+        )
+
+    def _build_resources_list(self) -> ResourcesListResponseResult:
+        return ResourcesListResponseResult.model_construct(
+            resources=[r.definition for r in self.resources.list()]
         )
 
     def _handle_resources_read(self, request: JsonRpcRequest) -> ResourcesResponse | JsonRpcError:
@@ -172,9 +285,9 @@ class MCPServer:
                 )
             )
 
-        return ResourcesResponse(
+        return ResourcesResponse.model_construct(
             id=request.id,
-            result=ResourcesReadResponseResult(
+            result=ResourcesReadResponseResult.model_construct(
                 contents=[resource.data],
             )
         )
@@ -183,22 +296,28 @@ class MCPServer:
         if request.id is None:
             return JsonRpcError(id=request.id, code=INVALID_PARAMS, message="Request ID is missing")
 
-        return ResourcesResponse(
+        return ResourcesResponse.model_construct(
             id=request.id,
-            result=ResourcesTemplatesListResult(
-                resourceTemplates=self.resources_templates.list()
-            )
+            result=self._cached_list_result(self.resources_templates, self._build_resources_templates_list)[0]
+        )
+
+    def _build_resources_templates_list(self) -> ResourcesTemplatesListResult:
+        return ResourcesTemplatesListResult.model_construct(
+            resourceTemplates=self.resources_templates.list()
         )
 
     def _handle_prompts_list(self, request: JsonRpcRequest) -> PromptsResponse | JsonRpcError:
         if request.id is None:
             return JsonRpcError(id=request.id, code=INVALID_PARAMS, message="Request ID is missing")
 
-        return PromptsResponse(
+        return PromptsResponse.model_construct(
             id=request.id,
-            result=PromptsListResponseResult(
-                prompts=[p.definition for p in self.prompts.list()]
-            )
+            result=self._cached_list_result(self.prompts, self._build_prompts_list)[0]
+        )
+
+    def _build_prompts_list(self) -> PromptsListResponseResult:
+        return PromptsListResponseResult.model_construct(
+            prompts=[p.definition for p in self.prompts.list()]
         )
 
     async def _handle_prompts_get(
@@ -211,11 +330,13 @@ class MCPServer:
         if not isinstance(params, dict):
             return JsonRpcError(id=request.id, code=INVALID_PARAMS, message="Params must be a dictionary")
 
-        prompt_name = params.get("name")
-        prompt_arguments = params.get("arguments", {})
+        try:
+            get_params = PromptsGetParams.model_validate(params)
+        except ValidationError as e:
+            return _invalid_params(request, e)
 
-        if not prompt_name:
-            return JsonRpcError(id=request.id, code=INVALID_PARAMS, message="Missing 'name' in parameters")
+        prompt_name = get_params.name
+        prompt_arguments = get_params.arguments
 
         prompt = self.prompts.get(prompt_name)
 
@@ -226,23 +347,30 @@ class MCPServer:
                 prompt.func(prompt_arguments),
                 timeout=prompt.timeout
             )
+
+            return PromptsResponse(
+                id=request.id,
+                result=prompt_result
+            )
+
         except asyncio.TimeoutError:
             return JsonRpcError(id=request.id, code=INTERNAL_ERROR, message=f"Prompt '{prompt_name}' timed out (> {prompt.timeout}s).")
 
-        return PromptsResponse(
-            id=request.id,
-            result=prompt_result
-        )
+        except Exception as e:
+            return JsonRpcError(id=request.id, code=INTERNAL_ERROR, message=f"Prompt '{prompt_name}' failed: {str(e)}")
 
     def _handle_tools_list(self, request: JsonRpcRequest) -> ToolsResponse | JsonRpcError:
         if request.id is None:
             return JsonRpcError(id=request.id, code=INVALID_PARAMS, message="Request ID is missing")
 
-        return ToolsResponse(
+        return ToolsResponse.model_construct(
             id=request.id,
-            result=ToolsListResponseResult(
-                tools=[t.definition for t in self.tools.list()]
-            )
+            result=self._cached_list_result(self.tools, self._build_tools_list)[0]
+        )
+
+    def _build_tools_list(self) -> ToolsListResponseResult:
+        return ToolsListResponseResult.model_construct(
+            tools=[t.definition for t in self.tools.list()]
         )
 
     async def _handle_tool_call(
@@ -257,19 +385,22 @@ class MCPServer:
             yield JsonRpcError(id=request.id, code=INVALID_PARAMS, message="Params must be a dictionary")
             return
 
-        tool_name = params.get("name")
-        args = params.get("arguments", {})
-        progress_token = params.get("progressToken") or params.get("_meta", {}).get("progressToken")
-
-        if not tool_name:
-            yield JsonRpcError(id=request.id, code=INVALID_PARAMS, message="Missing 'name'")
+        # validated once here (including the progress token), so progress events below skip validation
+        try:
+            call_params = CallToolParams.model_validate(params)
+        except ValidationError as e:
+            yield _invalid_params(request, e)
             return
 
+        tool_name = call_params.name
+        args = call_params.arguments
+        progress_token = call_params.progress_token
+
         tool = self.tools.get(tool_name)
         if tool is None:
-            yield ToolsResponse(
+            yield ToolsResponse.model_construct(
                 id=request.id,
-                result=ToolsCallResult(
+                result=ToolsCallResult.model_construct(
                     content=[ToolResultText(text=f"Tool '{tool_name}' not found.")],
                     isError=True,
                 )
@@ -281,20 +412,23 @@ class MCPServer:
 
         try:
             raw_result = tool.func(args)
+            func_kind = tool.func_kind
 
             iterator: AsyncIterator[ToolProgress | ToolResult]
 
-            if isinstance(raw_result, AsyncIteratorAbc):
-                iterator = raw_result
-            elif inspect.isawaitable(raw_result):
+            if func_kind == "asyncgen" or (func_kind == "unknown" and isinstance(raw_result, AsyncIteratorAbc)):
+                iterator = cast(AsyncIterator[ToolProgress | ToolResult], raw_result)
+            elif func_kind == "coroutine" or asyncio.iscoroutine(raw_result) or hasattr(raw_result, "__await__"):
+                awaitable = cast(Awaitable[ToolResult], raw_result)
+
                 async def _wrapper():
-                    yield await raw_result
+                    yield await awaitable
 
                 iterator = _wrapper()
             else:
-                yield ToolsResponse(
+                yield ToolsResponse.model_construct(
                     id=request.id,
-                    result=ToolsCallResult(
+                    result=ToolsCallResult.model_construct(
                         content=[ToolResultText(text=f"Invalid tool return type: {type(raw_result)}")],
                         isError=True,
                     )
@@ -304,66 +438,72 @@ class MCPServer:
             result_sent = False
 
             while True:
-                time_remaining = deadline - asyncio.get_running_loop().time()
-                if time_remaining <= 0:
-                    raise asyncio.TimeoutError()
-
+                # a timer is still armed and cancelled per step (timeout_at costs what wait_for did); one scope
+                # for the whole loop would have to span the yields below and cancel the consumer, not the tool
                 try:
-                    tool_output = await asyncio.wait_for(
-                        iterator.__anext__(),
-                        timeout=time_remaining
-                    )
+                    async with asyncio.timeout_at(deadline):
+                        tool_output = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
 
+                # identity checks for both classes first; isinstance goes through ABCMeta on pydantic
+                # models, so it only runs for subclasses
+                output_type = type(tool_output)
+                if output_type is not ToolProgress and output_type is not ToolResult:
                     if isinstance(tool_output, ToolProgress):
-                        if progress_token is not None:
-                            yield ProgressNotification(
-                                params=ProgressNotificationParams(
-                                    progressToken=progress_token,
-                                    progress=tool_output.progress,
-                                    total=tool_output.total,
-                                    message=tool_output.message
-                                )
-                            )
-
+                        output_type = ToolProgress
                     elif isinstance(tool_output, ToolResult):
-                        result_sent = True
-                        yield ToolsResponse(
-                            id=request.id,
-                            result=ToolsCallResult(
-                                content=tool_output.content,
-                                structuredContent=tool_output.structuredContent,
-                                isError=tool_output.isError
+                        output_type = ToolResult
+
+                if output_type is ToolProgress:
+                    if progress_token is not None:
+                        progress = cast(ToolProgress, tool_output)
+                        yield ProgressNotification.model_construct(
+                            params=ProgressNotificationParams.model_construct(
+                                progressToken=progress_token,
+                                progress=progress.progress,
+                                total=progress.total,
+                                message=progress.message
                             )
                         )
-                        break
 
-                    else:
-                        pass
-
-                except StopAsyncIteration:
+                elif output_type is ToolResult:
+                    result_sent = True
+                    tool_result = cast(ToolResult, tool_output)
+                    yield ToolsResponse.model_construct(
+                        id=request.id,
+                        result=ToolsCallResult.model_construct(
+                            content=tool_result.content,
+                            structuredContent=tool_result.structuredContent,
+                            isError=tool_result.isError
+                        )
+                    )
                     break
 
+                else:
+                    pass
+
             if not result_sent:
-                yield ToolsResponse(
+                yield ToolsResponse.model_construct(
                     id=request.id,
-                    result=ToolsCallResult(
+                    result=ToolsCallResult.model_construct(
                         content=[ToolResultText(text=f"Tool '{tool_name}' finished without returning a result.")],
                         isError=True
                     )
                 )
 
         except asyncio.TimeoutError:
-            yield ToolsResponse(
+            yield ToolsResponse.model_construct(
                 id=request.id,
-                result=ToolsCallResult(
+                result=ToolsCallResult.model_construct(
                     content=[ToolResultText(text=f"Tool execution timed out ({tool.timeout}s).")],
                     isError=True
                 )
             )
         except Exception as e:
-            yield ToolsResponse(
+            yield ToolsResponse.model_construct(
                 id=request.id,
-                result=ToolsCallResult(
+                result=ToolsCallResult.model_construct(
                     content=[ToolResultText(text=f"Internal Tool Error: {str(e)}")],
                     isError=True
                 )
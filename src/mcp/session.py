@@ -1,14 +1,22 @@
 import asyncio
 import time
-from typing import Any
+from collections import deque
+from typing import Any, List
 
 
 class Session:
+    __slots__ = ("id", "created_at", "last_accessed", "last_event_id", "_messages", "_has_messages", "_active")
+
     def __init__(self, session_id: str):
         self.id = session_id
         self.created_at = time.time()
-        self.last_accessed = time.time()
-        self.msg_queue: asyncio.Queue = asyncio.Queue()
+        # monotonic, only compared against other monotonic readings for idle expiry
+        self.last_accessed = time.monotonic()
+        # highest SSE event id sent for this session, so ids stay unique across batches and reconnects
+        self.last_event_id = 0
+        # single consumer (the SSE stream), so a deque plus one event is enough
+        self._messages: deque = deque()
+        self._has_messages = asyncio.Event()
         self._active = True
 
     @property
@@ -16,18 +24,29 @@ class Session:
         return self._active
 
     def touch(self):
-        self.last_accessed = time.time()
+        now = time.monotonic()
+        # touches within the same quarter second are coalesced into one write
+        if now - self.last_accessed > 0.25:
+            self.last_accessed = now
 
     def enqueue_message(self, message: Any):
         if not self._active:
             return
 
-        self.msg_queue.put_nowait(message)
+        self._messages.append(message)
+        self._has_messages.set()
+
+    async def wait_for_messages(self):
+        await self._has_messages.wait()
+
+    def drain_messages(self) -> List[Any]:
+        messages = list(self._messages)
+        self._messages.clear()
+        self._has_messages.clear()
+        return messages
 
     def terminate(self):
         self._active = False
-        while not self.msg_queue.empty():
-            try:
-                self.msg_queue.get_nowait()
-            except Exception:
-                pass
+        self._messages.clear()
+        # wake the stream so it observes the inactive session instead of waiting for the next ping
+        self._has_messages.set()